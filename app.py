@@ -3,6 +3,7 @@ import requests
 import os
 import logging
 from dotenv import load_dotenv
+from werkzeug.middleware.proxy_fix import ProxyFix
 
 # Load environment variables
 load_dotenv()
@@ -16,5 +17,14 @@ logging.basicConfig(
 app = Flask(__name__)
 app.config['SECRET_KEY'] = os.environ.get('SECRET_KEY', 'dev-secret-key')
 
+# Trust X-Forwarded-For only from the configured number of proxy hops
+try:
+    proxy_hops = int(os.environ.get('TRUSTED_PROXY_HOPS', 0))
+except ValueError:
+    logging.getLogger(__name__).warning("Invalid value for TRUSTED_PROXY_HOPS, using 0")
+    proxy_hops = 0
+if proxy_hops > 0:
+    app.wsgi_app = ProxyFix(app.wsgi_app, x_for=proxy_hops)
+
 # Import routes after app is created
 import routes
\ No newline at end of file
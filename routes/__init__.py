@@ -9,3 +9,4 @@ from routes.front.shop import *
 from routes.front.check import *
 from routes.front.profile import *
 from routes.front.detail import *
+from routes.front.feed import *
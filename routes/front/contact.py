@@ -1,6 +1,7 @@
 from app import app, render_template
 from flask import request, redirect, url_for
 import requests
+from utils.admission import limit_concurrency, rate_limit
 import os
 import logging
 
@@ -13,6 +14,8 @@ def contact():
 
 
 @app.post('/contact/submit')
+@rate_limit('contact')
+@limit_concurrency('upstream')
 def contact_submit():
     try:
         form = request.form
@@ -2,11 +2,13 @@
 from app import app, render_template
 from flask import request
 from utils.api_helper import api_helper
+from utils.admission import limit_concurrency
 import logging
 
 logger = logging.getLogger(__name__)
 
 @app.get('/detail')
+@limit_concurrency('catalog')
 def detail():
     products = api_helper.get_products()
     product_name = request.args.get('name') or request.args.get('product-title')
@@ -0,0 +1,114 @@
+from app import app
+from flask import request, Response, stream_with_context, url_for
+from utils.api_helper import api_helper
+from utils.admission import limit_concurrency, rate_limit
+from xml.sax.saxutils import escape
+import csv
+import io
+import json
+import logging
+
+logger = logging.getLogger(__name__)
+
+CSV_COLUMNS = ['id', 'title', 'price', 'category', 'description', 'image', 'rating_rate', 'rating_count']
+
+
+def _absolute_url(path):
+    """Turn a site-relative image path into an absolute URL for partners"""
+    if not path or path.startswith(('http://', 'https://')):
+        return path or ''
+    return request.host_url.rstrip('/') + '/' + path.lstrip('/')
+
+
+def _stream_feed(generate, mimetype, filename):
+    """
+    Stream a catalog feed with a version ETag
+
+    Answers If-None-Match with 304 when the partner already has the
+    current catalog version, otherwise streams the body row by row.
+    """
+    products, version = api_helper.get_catalog()
+
+    if request.if_none_match.contains_weak(version):
+        response = Response(status=304)
+        response.set_etag(version)
+        return response
+
+    logger.info(f"Streaming {filename} feed with {len(products)} products")
+    response = Response(stream_with_context(generate(products)), mimetype=mimetype)
+    response.set_etag(version)
+    response.headers['Content-Disposition'] = f'inline; filename="{filename}"'
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+
+def _generate_csv(products):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    def flush():
+        row = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        return row
+
+    writer.writerow(CSV_COLUMNS)
+    yield flush()
+
+    for p in products:
+        rating = p.get('rating') or {}
+        writer.writerow([
+            p.get('id'),
+            p.get('title'),
+            p.get('price'),
+            p.get('category'),
+            p.get('description'),
+            _absolute_url(p.get('image')),
+            rating.get('rate'),
+            rating.get('count')
+        ])
+        yield flush()
+
+
+def _generate_jsonl(products):
+    for p in products:
+        yield json.dumps(p, ensure_ascii=False) + '\n'
+
+
+def _generate_sitemap(products):
+    yield ('<?xml version="1.0" encoding="UTF-8"?>\n'
+           '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9"\n'
+           '        xmlns:image="http://www.google.com/schemas/sitemap-image/1.1">\n')
+
+    for p in products:
+        loc = url_for('detail', id=p.get('id'), _external=True)
+        entry = f'  <url>\n    <loc>{escape(loc)}</loc>\n'
+        if p.get('image'):
+            entry += f'    <image:image><image:loc>{escape(_absolute_url(p["image"]))}</image:loc></image:image>\n'
+        yield entry + '  </url>\n'
+
+    yield '</urlset>\n'
+
+
+@app.get('/feeds/products.csv')
+@rate_limit('feed')
+@limit_concurrency('catalog')
+def feed_products_csv():
+    """Full catalog as CSV"""
+    return _stream_feed(_generate_csv, 'text/csv', 'products.csv')
+
+
+@app.get('/feeds/products.jsonl')
+@rate_limit('feed')
+@limit_concurrency('catalog')
+def feed_products_jsonl():
+    """Full catalog as JSON Lines"""
+    return _stream_feed(_generate_jsonl, 'application/x-ndjson', 'products.jsonl')
+
+
+@app.get('/feeds/sitemap.xml')
+@rate_limit('feed')
+@limit_concurrency('catalog')
+def feed_sitemap():
+    """XML sitemap of product detail pages"""
+    return _stream_feed(_generate_sitemap, 'application/xml', 'sitemap.xml')
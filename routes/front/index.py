@@ -1,5 +1,6 @@
 from app import app,render_template
 from utils.api_helper import api_helper
+from utils.admission import limit_concurrency
 import logging
 
 logger = logging.getLogger(__name__)
@@ -7,6 +8,7 @@ logger = logging.getLogger(__name__)
 
 @app.route('/')
 @app.route('/home')
+@limit_concurrency('catalog')
 def home():
     products = api_helper.get_products()
     products = products[:4]  # Display only the first 4 products on the home page
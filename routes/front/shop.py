@@ -1,11 +1,13 @@
 from app import app,render_template,request,jsonify
 from utils.api_helper import api_helper
+from utils.admission import limit_concurrency, rate_limit
 import logging
 
 logger = logging.getLogger(__name__)
 
 
 @app.get('/shop')
+@limit_concurrency('catalog')
 def shop():
     products = api_helper.get_products()
     
@@ -23,6 +25,8 @@ def shop():
     return render_template("front/shop.html", products=products)
 
 @app.route('/api/products/filter')
+@rate_limit('filter')
+@limit_concurrency('catalog')
 def filter_products():
     """API endpoint for filtering products"""
     data = api_helper.get_products()
@@ -49,12 +53,12 @@ def filter_products():
     
     # Sort products
     if sort_by == 'price-asc':
-        data.sort(key=lambda x: x['price'])
+        data = sorted(data, key=lambda x: x['price'])
     elif sort_by == 'price-desc':
-        data.sort(key=lambda x: x['price'], reverse=True)
+        data = sorted(data, key=lambda x: x['price'], reverse=True)
     elif sort_by == 'name-asc':
-        data.sort(key=lambda x: x['title'])
+        data = sorted(data, key=lambda x: x['title'])
     elif sort_by == 'name-desc':
-        data.sort(key=lambda x: x['title'], reverse=True)
+        data = sorted(data, key=lambda x: x['title'], reverse=True)
     
     return jsonify(data)
\ No newline at end of file
@@ -0,0 +1,127 @@
+"""
+Tests for per-route admission control and client rate limits
+Run with pytest or directly: python test_admission.py
+"""
+import threading
+import time
+from unittest import mock
+
+from app import app
+import routes
+from utils.admission import CONCURRENCY_LIMITS, RATE_LIMITS, TokenBucket, reset_rate_limits
+
+CONTACT_FORM = {'name': 'Test', 'email': 'test@example.com', 'message': 'Hello'}
+
+
+def test_token_bucket_refills_over_time():
+    bucket = TokenBucket('test', rate=1.0, burst=2)
+    with mock.patch('utils.admission.time.monotonic', return_value=100.0):
+        assert bucket.consume('a') == 0
+        assert bucket.consume('a') == 0
+        assert bucket.consume('a') == 1.0
+        # Other clients have their own bucket
+        assert bucket.consume('b') == 0
+
+    with mock.patch('utils.admission.time.monotonic', return_value=100.5):
+        assert bucket.consume('a') == 0.5
+
+    with mock.patch('utils.admission.time.monotonic', return_value=101.5):
+        assert bucket.consume('a') == 0
+        assert bucket.consume('a') > 0
+
+        bucket.reset()
+        assert bucket.consume('a') == 0
+
+
+def test_contact_rate_limit_returns_429_with_retry_after():
+    reset_rate_limits()
+    burst = int(RATE_LIMITS['contact'].burst)
+
+    with mock.patch('routes.front.contact.requests.post'), app.test_client() as client:
+        for _ in range(burst):
+            assert client.post('/contact/submit', data=CONTACT_FORM).status_code == 302
+
+        response = client.post('/contact/submit', data=CONTACT_FORM)
+        assert response.status_code == 429
+        assert int(response.headers['Retry-After']) >= 1
+
+
+def test_rate_limit_ignores_spoofed_forwarded_for():
+    reset_rate_limits()
+    burst = int(RATE_LIMITS['contact'].burst)
+
+    with mock.patch('routes.front.contact.requests.post'), app.test_client() as client:
+        codes = [
+            client.post('/contact/submit', data=CONTACT_FORM,
+                        headers={'X-Forwarded-For': f'10.0.0.{i}'}).status_code
+            for i in range(burst + 1)
+        ]
+
+    assert codes[-1] == 429
+
+
+def test_request_queued_past_deadline_is_shed():
+    queued_since = time.time() - CONCURRENCY_LIMITS['catalog'].queue_timeout - 1
+
+    with app.test_client() as client:
+        response = client.get('/shop', headers={'X-Request-Start': f't={int(queued_since * 1e6)}'})
+
+    assert response.status_code == 503
+    assert 'Retry-After' in response.headers
+
+
+def test_saturated_route_class_fails_fast():
+    limit = CONCURRENCY_LIMITS['upstream']
+    release = threading.Event()
+    entered = threading.Semaphore(0)
+
+    def slow_post(*args, **kwargs):
+        entered.release()
+        release.wait(5)
+        return mock.Mock()
+
+    reset_rate_limits()
+    with mock.patch('routes.front.contact.requests.post', side_effect=slow_post), \
+            mock.patch.object(limit, 'queue_timeout', 0.05):
+        # Fill every slot with an in-flight request from a distinct client
+        threads = [
+            threading.Thread(target=lambda i=i: app.test_client().post(
+                '/contact/submit', data=CONTACT_FORM,
+                environ_base={'REMOTE_ADDR': f'192.0.2.{i}'}))
+            for i in range(limit.max_concurrent)
+        ]
+        for t in threads:
+            t.start()
+        for _ in threads:
+            assert entered.acquire(timeout=5)
+
+        started = time.monotonic()
+        response = app.test_client().post('/contact/submit', data=CONTACT_FORM,
+                                          environ_base={'REMOTE_ADDR': '192.0.2.200'})
+        elapsed = time.monotonic() - started
+
+        release.set()
+        for t in threads:
+            t.join()
+
+    assert response.status_code == 503
+    assert response.headers['Retry-After'] == '1'
+    assert elapsed < 1
+
+
+def test_cheap_routes_are_not_limited():
+    with app.test_client() as client:
+        response = client.get('/about', headers={'X-Request-Start': 't=1'})
+    assert response.status_code == 200
+
+
+if __name__ == '__main__':
+    for test in (test_token_bucket_refills_over_time,
+                 test_contact_rate_limit_returns_429_with_retry_after,
+                 test_rate_limit_ignores_spoofed_forwarded_for,
+                 test_request_queued_past_deadline_is_shed,
+                 test_saturated_route_class_fails_fast,
+                 test_cheap_routes_are_not_limited):
+        print(f"Running {test.__name__}...")
+        test()
+    print("All admission tests passed")
@@ -0,0 +1,162 @@
+"""
+Concurrency stress test for APIHelper snapshot publishing
+Run with pytest or directly: python test_api_helper_concurrency.py
+"""
+import itertools
+import json
+import os
+import tempfile
+import threading
+import time
+from unittest import mock
+
+import requests
+
+from utils.api_helper import APIHelper
+
+
+class FakeUpstream:
+    """Stands in for requests.get; every call returns a new catalog generation"""
+
+    def __init__(self, delay=0.0, fail=False):
+        self.delay = delay
+        self.fail = fail
+        self.calls = 0
+        self._generations = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def __call__(self, url, timeout=None, headers=None):
+        with self._lock:
+            self.calls += 1
+            generation = next(self._generations)
+        time.sleep(self.delay)
+        if self.fail:
+            raise requests.exceptions.ConnectionError("upstream down")
+
+        response = mock.Mock()
+        response.raise_for_status.return_value = None
+        response.json.return_value = [
+            {"id": i, "title": f"Product {i}", "price": 10.0 + i,
+             "category": "men's clothing", "generation": generation}
+            for i in range(1, 51)
+        ]
+        return response
+
+
+def _run_threads(targets):
+    """Run each target in its own thread and return any exceptions raised"""
+    errors = []
+
+    def wrapped(target):
+        try:
+            target()
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=wrapped, args=(t,)) for t in targets]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return errors
+
+
+def test_cold_start_fetches_once():
+    helper = APIHelper()
+    upstream = FakeUpstream(delay=0.2)
+    barrier = threading.Barrier(32)
+    results = []
+
+    def reader():
+        barrier.wait()
+        results.append(helper.get_products())
+
+    with mock.patch('utils.api_helper.requests.get', upstream):
+        errors = _run_threads([reader] * 32)
+
+    assert not errors, errors
+    assert upstream.calls == 1
+    assert all(r is results[0] for r in results)
+    assert len(results[0]) == 50
+
+
+def test_readers_see_consistent_snapshots_during_refreshes():
+    with tempfile.TemporaryDirectory() as tmp:
+        snapshot_path = os.path.join(tmp, 'catalog.json')
+        helper = APIHelper(snapshot_path=snapshot_path)
+        upstream = FakeUpstream(delay=0.001)
+        stop = threading.Event()
+        versions = set()
+        versions_lock = threading.Lock()
+
+        def reader():
+            while not stop.is_set():
+                products, version = helper.get_catalog()
+                assert len(products) == 50
+                assert len({p['generation'] for p in products}) == 1
+                assert version == APIHelper._compute_version(products)
+                with versions_lock:
+                    versions.add(version)
+                # Give the writers a chance at the GIL
+                time.sleep(0.0005)
+
+        writers_left = threading.Semaphore(0)
+
+        def writer():
+            try:
+                for _ in range(10):
+                    helper.clear_cache()
+                    helper.get_products(use_cache=False)
+                    time.sleep(0.001)
+            finally:
+                writers_left.release()
+
+        def stopper():
+            for _ in range(4):
+                writers_left.acquire()
+            stop.set()
+
+        with mock.patch('utils.api_helper.requests.get', upstream):
+            errors = _run_threads([reader] * 16 + [writer] * 4 + [stopper])
+            assert helper.wait_for_refresh(timeout=5)
+
+        assert not errors, errors
+        # Readers may win the refresh after a writer expires the snapshot
+        assert upstream.calls >= 40
+        assert len(versions) > 1
+
+        # The file on disk is always a complete, loadable snapshot
+        with open(snapshot_path) as f:
+            assert len(json.load(f)['products']) == 50
+        assert os.listdir(tmp) == ['catalog.json']
+
+
+def test_outage_serves_last_known_good_without_stampede():
+    helper = APIHelper()
+    with mock.patch('utils.api_helper.requests.get', FakeUpstream()):
+        good = helper.get_products()
+
+    helper.clear_cache()
+    upstream = FakeUpstream(delay=0.1, fail=True)
+    results = []
+
+    def reader():
+        for _ in range(20):
+            results.append(helper.get_products())
+
+    with mock.patch('utils.api_helper.requests.get', upstream):
+        errors = _run_threads([reader] * 16)
+        assert helper.wait_for_refresh(timeout=5)
+
+    assert not errors, errors
+    assert upstream.calls == 1
+    assert all(r is good for r in results)
+
+
+if __name__ == '__main__':
+    for test in (test_cold_start_fetches_once,
+                 test_readers_see_consistent_snapshots_during_refreshes,
+                 test_outage_serves_last_known_good_without_stampede):
+        print(f"Running {test.__name__}...")
+        test()
+    print("All concurrency tests passed")
@@ -0,0 +1,143 @@
+"""
+Tests for the on-disk last-known-good catalog snapshot
+Run with pytest or directly: python test_catalog_snapshot.py
+"""
+import json
+import os
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+from unittest import mock
+
+import requests
+
+from utils.api_helper import APIHelper, SNAPSHOT_FORMAT_VERSION
+
+PRODUCTS = [
+    {"id": 1, "title": "Snapshot Hoody", "price": 45.99, "category": "men's clothing"},
+    {"id": 2, "title": "Snapshot Dress", "price": 59.99, "category": "women's clothing"},
+]
+
+
+def _upstream(data=None, error=None, delay=None):
+    """Build a fake requests.get returning data or raising error after an optional delay"""
+    def fake_get(url, timeout=None, headers=None):
+        if isinstance(delay, threading.Event):
+            delay.wait(5)
+        elif delay:
+            time.sleep(delay)
+        if error:
+            raise error
+        response = mock.Mock()
+        response.raise_for_status.return_value = None
+        response.json.return_value = data
+        return response
+    return mock.Mock(side_effect=fake_get)
+
+
+def _write_snapshot(path, saved_at, products=PRODUCTS):
+    with open(path, 'w') as f:
+        json.dump({'version': SNAPSHOT_FORMAT_VERSION,
+                   'saved_at': saved_at.isoformat(),
+                   'products': products}, f)
+
+
+def test_successful_fetch_round_trips_through_disk():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'instance', 'catalog.json')
+        with mock.patch('utils.api_helper.requests.get', _upstream(PRODUCTS)):
+            APIHelper(snapshot_path=path).get_products()
+
+        assert os.listdir(os.path.dirname(path)) == ['catalog.json']
+
+        upstream = _upstream(error=AssertionError("network must not be used"))
+        with mock.patch('utils.api_helper.requests.get', upstream):
+            products = APIHelper(snapshot_path=path).get_products()
+
+        assert list(products) == PRODUCTS
+        assert upstream.call_count == 0
+
+
+def test_stale_snapshot_is_served_and_then_refreshed():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'catalog.json')
+        _write_snapshot(path, datetime.now() - timedelta(days=3))
+        helper = APIHelper(snapshot_path=path)
+
+        fresh = [{"id": 3, "title": "Fresh Tee", "price": 9.99, "category": "men's clothing"}]
+        fetched = threading.Event()
+        upstream = _upstream(fresh, delay=fetched)
+        with mock.patch('utils.api_helper.requests.get', upstream):
+            # The stale catalog comes back without waiting on the upstream
+            assert list(helper.get_products()) == PRODUCTS
+            fetched.set()
+            assert helper.wait_for_refresh(timeout=5)
+
+        assert upstream.call_count == 1
+        assert list(helper.get_products()) == fresh
+
+
+def test_outage_at_boot_serves_snapshot_without_waiting():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'catalog.json')
+        _write_snapshot(path, datetime.now() - timedelta(days=3))
+        helper = APIHelper(snapshot_path=path)
+
+        down = _upstream(error=requests.exceptions.ConnectionError("down"), delay=0.5)
+        with mock.patch('utils.api_helper.requests.get', down):
+            started = time.monotonic()
+            assert list(helper.get_products()) == PRODUCTS
+            assert time.monotonic() - started < 0.1
+
+            assert helper.wait_for_refresh(timeout=5)
+            # Still the snapshot, not the fallback, once the refresh failed
+            assert list(helper.get_products()) == PRODUCTS
+        assert down.call_count == 1
+
+
+def test_empty_upstream_response_keeps_last_known_good():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'catalog.json')
+        helper = APIHelper(snapshot_path=path)
+        with mock.patch('utils.api_helper.requests.get', _upstream(PRODUCTS)):
+            helper.get_products()
+
+        helper.clear_cache()
+        with mock.patch('utils.api_helper.requests.get', _upstream([])):
+            assert list(helper.get_products(use_cache=False)) == PRODUCTS
+
+        helper.clear_cache()
+        down = _upstream(error=requests.exceptions.ConnectionError("down"))
+        with mock.patch('utils.api_helper.requests.get', down):
+            assert list(helper.get_products(use_cache=False)) == PRODUCTS
+
+        with open(path) as f:
+            assert json.load(f)['products'] == PRODUCTS
+
+
+def test_corrupt_or_unknown_snapshot_is_ignored():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'catalog.json')
+        down = _upstream(error=requests.exceptions.ConnectionError("down"))
+
+        for content in ('{"version": 1, "products": [', json.dumps({'version': 99, 'products': PRODUCTS})):
+            with open(path, 'w') as f:
+                f.write(content)
+            helper = APIHelper(snapshot_path=path)
+            assert helper._snapshot is None
+
+            with mock.patch('utils.api_helper.requests.get', down):
+                products = helper.get_products()
+            assert list(products) == helper._get_fallback_products()
+
+
+if __name__ == '__main__':
+    for test in (test_successful_fetch_round_trips_through_disk,
+                 test_stale_snapshot_is_served_and_then_refreshed,
+                 test_outage_at_boot_serves_snapshot_without_waiting,
+                 test_empty_upstream_response_keeps_last_known_good,
+                 test_corrupt_or_unknown_snapshot_is_ignored):
+        print(f"Running {test.__name__}...")
+        test()
+    print("All snapshot tests passed")
@@ -0,0 +1,114 @@
+"""
+Tests for the streaming product feed endpoints
+Run with pytest or directly: python test_feed.py
+"""
+import csv
+import io
+import json
+import xml.etree.ElementTree as ET
+from unittest import mock
+
+from app import app
+import routes
+from utils.admission import CONCURRENCY_LIMITS, reset_rate_limits
+from utils.api_helper import APIHelper
+
+PRODUCTS = (
+    {"id": 1, "title": 'Hoody, "Black"', "price": 45.99, "category": "men's clothing",
+     "description": "Warm", "image": "/static/hoody.jpg", "rating": {"rate": 4.5, "count": 120}},
+    {"id": 2, "title": "Dress & Co", "price": 59.99, "category": "women's clothing",
+     "description": "Line one\nline two", "image": "https://cdn.example.com/dress.jpg",
+     "rating": {"rate": 4.7, "count": 223}},
+)
+VERSION = APIHelper._compute_version(PRODUCTS)
+
+
+def _get(path, **kwargs):
+    reset_rate_limits()
+    with mock.patch('routes.front.feed.api_helper.get_catalog', return_value=(PRODUCTS, VERSION)):
+        with app.test_client() as client:
+            return client.get(path, **kwargs)
+
+
+def test_csv_feed():
+    response = _get('/feeds/products.csv')
+    assert response.status_code == 200
+    assert response.is_streamed
+    assert response.headers['ETag'] == f'"{VERSION}"'
+
+    rows = list(csv.DictReader(io.StringIO(response.get_data(as_text=True))))
+    assert [r['title'] for r in rows] == [p['title'] for p in PRODUCTS]
+    assert rows[1]['description'] == "Line one\nline two"
+    assert rows[0]['image'] == 'http://localhost/static/hoody.jpg'
+    assert rows[1]['image'] == 'https://cdn.example.com/dress.jpg'
+    assert rows[0]['rating_count'] == '120'
+
+
+def test_jsonl_feed():
+    response = _get('/feeds/products.jsonl')
+    assert response.status_code == 200
+    lines = response.get_data(as_text=True).splitlines()
+    assert [json.loads(line) for line in lines] == list(PRODUCTS)
+
+
+def test_sitemap_feed():
+    response = _get('/feeds/sitemap.xml')
+    assert response.status_code == 200
+    ns = {'s': 'http://www.sitemaps.org/schemas/sitemap/0.9'}
+    root = ET.fromstring(response.get_data())
+    locs = [loc.text for loc in root.findall('s:url/s:loc', ns)]
+    assert locs == ['http://localhost/detail?id=1', 'http://localhost/detail?id=2']
+
+
+def test_if_none_match_returns_304():
+    for etag in (f'"{VERSION}"', f'W/"{VERSION}"', f'"other", "{VERSION}"'):
+        response = _get('/feeds/products.csv', headers={'If-None-Match': etag})
+        assert response.status_code == 304, etag
+        assert response.get_data() == b''
+        assert response.headers['ETag'] == f'"{VERSION}"'
+
+    response = _get('/feeds/products.csv', headers={'If-None-Match': '"stale"'})
+    assert response.status_code == 200
+
+
+def test_streaming_feed_holds_catalog_slot_until_closed():
+    limit = CONCURRENCY_LIMITS['catalog']
+    before = limit.in_flight
+
+    reset_rate_limits()
+    with mock.patch('routes.front.feed.api_helper.get_catalog', return_value=(PRODUCTS, VERSION)):
+        response = app.test_client().get('/feeds/products.csv', buffered=False)
+
+    assert response.status_code == 200
+    assert limit.in_flight == before + 1
+    next(response.response)
+    assert limit.in_flight == before + 1
+
+    response.close()
+    assert limit.in_flight == before
+
+
+def test_not_modified_feed_releases_catalog_slot():
+    limit = CONCURRENCY_LIMITS['catalog']
+    before = limit.in_flight
+    response = _get('/feeds/products.csv', headers={'If-None-Match': f'"{VERSION}"'})
+    assert response.status_code == 304
+    assert limit.in_flight == before
+
+
+def test_feeds_are_load_shed():
+    response = _get('/feeds/products.jsonl', headers={'X-Request-Start': 't=1'})
+    assert response.status_code == 503
+
+
+if __name__ == '__main__':
+    for test in (test_csv_feed,
+                 test_jsonl_feed,
+                 test_sitemap_feed,
+                 test_if_none_match_returns_304,
+                 test_streaming_feed_holds_catalog_slot_until_closed,
+                 test_not_modified_feed_releases_catalog_slot,
+                 test_feeds_are_load_shed):
+        print(f"Running {test.__name__}...")
+        test()
+    print("All feed tests passed")
@@ -0,0 +1,213 @@
+"""
+Admission control helpers
+Per-route concurrency limits, queue-time deadlines and per-client rate limits
+so one slow path cannot drag down the whole site
+"""
+from flask import Response, request
+from functools import wraps
+from typing import Dict, Optional, Tuple
+import math
+import os
+import threading
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def _env_float(name: str, default: float) -> float:
+    """Read a float setting from the environment"""
+    try:
+        return float(os.environ.get(name, default))
+    except ValueError:
+        logger.warning(f"Invalid value for {name}, using {default}")
+        return default
+
+
+def _overloaded(message: str, status: int, retry_after: float):
+    """Build a fail-fast response with a Retry-After header"""
+    return message, status, {'Retry-After': str(max(1, math.ceil(retry_after)))}
+
+
+def _queue_time() -> Optional[float]:
+    """
+    Seconds the request spent queued before reaching the worker
+
+    Uses the X-Request-Start header set by the router/proxy, which may be
+    in seconds, milliseconds or microseconds, optionally prefixed with "t=".
+    """
+    header = request.headers.get('X-Request-Start')
+    if not header:
+        return None
+
+    try:
+        started = float(header.strip().removeprefix('t='))
+    except ValueError:
+        return None
+
+    if started > 1e14:
+        started /= 1e6
+    elif started > 1e11:
+        started /= 1e3
+
+    return max(0.0, time.time() - started)
+
+
+class ConcurrencyLimit:
+    """Bounded number of in-flight requests for one route class"""
+
+    def __init__(self, name: str, max_concurrent: int, queue_timeout: float):
+        self.name = name
+        self.max_concurrent = max_concurrent
+        self.queue_timeout = queue_timeout
+        self._semaphore = threading.BoundedSemaphore(max_concurrent)
+
+    def acquire(self) -> bool:
+        """Wait up to the remaining queue deadline for a free slot"""
+        waited = _queue_time() or 0.0
+        remaining = self.queue_timeout - waited
+        if remaining <= 0:
+            logger.warning(f"Shedding {request.path}: queued {waited:.2f}s (class {self.name})")
+            return False
+
+        if not self._semaphore.acquire(timeout=remaining):
+            logger.warning(f"Shedding {request.path}: {self.max_concurrent} requests in flight (class {self.name})")
+            return False
+        return True
+
+    def release(self) -> None:
+        self._semaphore.release()
+
+    @property
+    def in_flight(self) -> int:
+        """Number of requests currently holding a slot"""
+        return self.max_concurrent - self._semaphore._value
+
+
+class TokenBucket:
+    """Per-client token bucket rate limiter"""
+
+    # Forget idle clients once this many are tracked
+    MAX_CLIENTS = 10000
+
+    def __init__(self, name: str, rate: float, burst: float):
+        self.name = name
+        self.rate = rate
+        self.burst = burst
+        self._buckets: Dict[str, Tuple[float, float]] = {}
+        self._lock = threading.Lock()
+
+    def consume(self, client: str) -> float:
+        """
+        Take one token for the client
+
+        Returns:
+            0 if the request is allowed, otherwise seconds until a token is free
+        """
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.get(client, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - updated) * self.rate)
+
+            if tokens < 1:
+                self._buckets[client] = (tokens, now)
+                return (1 - tokens) / self.rate
+
+            self._buckets[client] = (tokens - 1, now)
+            if len(self._buckets) > self.MAX_CLIENTS:
+                self._prune(now)
+            return 0.0
+
+    def reset(self) -> None:
+        """Forget all clients, giving everyone a full bucket again"""
+        with self._lock:
+            self._buckets.clear()
+
+    def _prune(self, now: float) -> None:
+        """Drop clients whose bucket would already be full again"""
+        refill_time = self.burst / self.rate
+        self._buckets = {
+            client: state for client, state in self._buckets.items()
+            if now - state[1] < refill_time
+        }
+
+
+# Route classes: slow paths get a small in-flight budget and a short queue
+# deadline, cheap pages (/about, /faq, ...) are left unlimited.
+# Limits are per worker process and only bite with threaded workers
+# (see Procfile); sync workers serve one request at a time, so there only
+# the X-Request-Start queue deadline sheds load.
+CONCURRENCY_LIMITS = {
+    name: ConcurrencyLimit(
+        name,
+        max_concurrent=max(1, int(_env_float(f'ADMISSION_{name.upper()}_CONCURRENCY', concurrent))),
+        queue_timeout=_env_float(f'ADMISSION_{name.upper()}_QUEUE_TIMEOUT', timeout)
+    )
+    for name, concurrent, timeout in (
+        ('upstream', 4, 0.5),   # calls out to Telegram
+        ('catalog', 8, 1.0),    # may hit FakeStore on a cache miss
+    )
+}
+
+RATE_LIMITS = {
+    name: TokenBucket(
+        name,
+        rate=max(0.001, _env_float(f'RATE_LIMIT_{name.upper()}_PER_MINUTE', per_minute) / 60),
+        burst=max(1.0, _env_float(f'RATE_LIMIT_{name.upper()}_BURST', burst))
+    )
+    for name, per_minute, burst in (
+        ('contact', 5, 3),
+        ('filter', 120, 20),
+        ('feed', 30, 10),
+    )
+}
+
+
+def reset_rate_limits() -> None:
+    """Reset every per-client rate limit"""
+    for bucket in RATE_LIMITS.values():
+        bucket.reset()
+
+
+def limit_concurrency(route_class: str):
+    """Fail fast with 503 when a route class is saturated or the request queued too long"""
+    limit = CONCURRENCY_LIMITS[route_class]
+
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if not limit.acquire():
+                return _overloaded("Service busy, please try again shortly", 503, limit.queue_timeout)
+            try:
+                response = view(*args, **kwargs)
+            except BaseException:
+                limit.release()
+                raise
+
+            # Streamed bodies keep the slot until the server closes them
+            if isinstance(response, Response) and response.is_streamed:
+                response.call_on_close(limit.release)
+            else:
+                limit.release()
+            return response
+        return wrapper
+    return decorator
+
+
+def rate_limit(name: str):
+    """Fail fast with 429 when the client has used up its token bucket"""
+    bucket = RATE_LIMITS[name]
+
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            # X-Forwarded-For is client-controlled; behind a proxy, ProxyFix
+            # (TRUSTED_PROXY_HOPS) rewrites remote_addr from trusted hops only
+            client = request.remote_addr or 'unknown'
+            retry_after = bucket.consume(client)
+            if retry_after:
+                logger.warning(f"Rate limit '{name}' exceeded for {client}")
+                return _overloaded("Too many requests, please slow down", 429, retry_after)
+            return view(*args, **kwargs)
+        return wrapper
+    return decorator
@@ -4,62 +4,226 @@ Centralized API calls with error handling and caching
 """
 import requests
 from datetime import datetime, timedelta
-from typing import Optional, List, Dict
+from typing import NamedTuple, Optional, List, Dict, Sequence, Tuple
+import hashlib
+import json
 import logging
+import os
+import tempfile
+import threading
 
 logger = logging.getLogger(__name__)
 
+# Last-known-good catalog snapshot, shared by all workers on the host
+DEFAULT_SNAPSHOT_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    'instance', 'catalog_snapshot.json'
+)
+SNAPSHOT_FORMAT_VERSION = 1
+
+
+class CatalogSnapshot(NamedTuple):
+    """
+    Immutable, versioned view of the product catalog
+
+    A snapshot is never modified once published; refreshes publish a new
+    one. Readers must treat the product dicts as read-only.
+    """
+    products: Tuple[Dict, ...]
+    version: str
+    timestamp: datetime
+
+
 class APIHelper:
-    def __init__(self, base_url: str = "https://fakestoreapi.com", timeout: int = 10):
+    """
+    Product catalog client that is safe to share between threads
+
+    The current catalog lives in a single CatalogSnapshot reference.
+    Readers grab that reference without locking; refreshes are serialized
+    by a lock and publish a new snapshot with one assignment.
+    """
+
+    def __init__(self, base_url: str = "https://fakestoreapi.com", timeout: int = 10,
+                 snapshot_path: Optional[str] = None):
         self.base_url = base_url
         self.timeout = timeout
-        self._cache = {}
         self._cache_duration = timedelta(minutes=5)
+        # Don't retry the upstream more often than this after a failure
+        self._retry_interval = timedelta(seconds=30)
+        self.snapshot_path = snapshot_path
+        self._snapshot: Optional[CatalogSnapshot] = None
+        self._fallback: Optional[CatalogSnapshot] = None
+        self._failed_at: Optional[datetime] = None
+        self._refresh_lock = threading.Lock()
+        
+        # Warm the cache from disk before any network call is made
+        self._load_snapshot()
     
-    def _is_cache_valid(self, key: str) -> bool:
-        """Check if cached data is still valid"""
-        if key not in self._cache:
-            return False
+    def _is_fresh(self, snapshot: Optional[CatalogSnapshot]) -> bool:
+        """Check if a snapshot is still within the cache duration"""
+        return snapshot is not None and datetime.now() - snapshot.timestamp < self._cache_duration
+    
+    def _publish(self, data: List[Dict], timestamp: Optional[datetime] = None) -> CatalogSnapshot:
+        """Atomically replace the current snapshot; caller must hold the refresh lock"""
+        products = tuple(data)
+        snapshot = CatalogSnapshot(products, self._compute_version(products), timestamp or datetime.now())
+        self._snapshot = snapshot
+        logger.info(f"Published catalog version {snapshot.version[:12]} ({len(products)} products)")
+        return snapshot
+    
+    @staticmethod
+    def _compute_version(data: Sequence[Dict]) -> str:
+        """Content hash identifying a catalog version"""
+        payload = json.dumps(list(data), sort_keys=True, separators=(',', ':')).encode('utf-8')
+        return hashlib.sha1(payload).hexdigest()
+    
+    def _load_snapshot(self) -> None:
+        """Seed the catalog from the on-disk snapshot, if one exists"""
+        if not self.snapshot_path:
+            return
         
-        cached_time = self._cache[key].get('timestamp')
-        if not cached_time:
-            return False
+        try:
+            with open(self.snapshot_path, 'rb') as f:
+                snapshot = json.loads(f.read())
+        except FileNotFoundError:
+            logger.info(f"No catalog snapshot at {self.snapshot_path}")
+            return
+        except (OSError, ValueError) as e:
+            logger.warning(f"Could not read catalog snapshot {self.snapshot_path}: {e}")
+            return
         
-        return datetime.now() - cached_time < self._cache_duration
-    
-    def _get_from_cache(self, key: str) -> Optional[List[Dict]]:
-        """Get data from cache if valid"""
-        if self._is_cache_valid(key):
-            logger.info(f"Cache hit for key: {key}")
-            return self._cache[key]['data']
-        return None
+        if not isinstance(snapshot, dict) or snapshot.get('version') != SNAPSHOT_FORMAT_VERSION:
+            logger.warning(f"Ignoring catalog snapshot with unknown format: {self.snapshot_path}")
+            return
+        
+        products = snapshot.get('products')
+        if not isinstance(products, list) or not products:
+            return
+        
+        # Keep the original fetch time so an old snapshot is served right
+        # away but still refreshed once it is past the cache duration
+        try:
+            saved_at = datetime.fromisoformat(snapshot.get('saved_at'))
+        except (TypeError, ValueError):
+            saved_at = datetime.min
+        
+        with self._refresh_lock:
+            self._publish(products, timestamp=saved_at)
+        logger.info(f"Loaded {len(products)} products from snapshot saved at {snapshot.get('saved_at')}")
     
-    def _save_to_cache(self, key: str, data: List[Dict]) -> None:
-        """Save data to cache"""
-        self._cache[key] = {
-            'data': data,
-            'timestamp': datetime.now()
+    def _save_snapshot(self, snapshot: CatalogSnapshot) -> None:
+        """Atomically persist a successful fetch as the last-known-good snapshot"""
+        if not self.snapshot_path:
+            return
+        
+        payload = {
+            'version': SNAPSHOT_FORMAT_VERSION,
+            'saved_at': snapshot.timestamp.isoformat(),
+            'products': list(snapshot.products)
         }
-        logger.info(f"Cached data for key: {key}")
+        directory = os.path.dirname(self.snapshot_path) or '.'
+        tmp_path = None
+        try:
+            os.makedirs(directory, exist_ok=True)
+            # Write to a temp file in the same directory, then rename over the
+            # old snapshot so readers never see a partially written file
+            fd, tmp_path = tempfile.mkstemp(prefix='.catalog-', suffix='.tmp', dir=directory)
+            with os.fdopen(fd, 'wb') as f:
+                f.write(json.dumps(payload, separators=(',', ':')).encode('utf-8'))
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.snapshot_path)
+            tmp_path = None
+            logger.info(f"Saved catalog snapshot to {self.snapshot_path}")
+        except (OSError, TypeError, ValueError) as e:
+            logger.warning(f"Could not save catalog snapshot {self.snapshot_path}: {e}")
+        finally:
+            if tmp_path and os.path.exists(tmp_path):
+                os.remove(tmp_path)
+    
+    def _get_last_known_good(self) -> CatalogSnapshot:
+        """Return the newest snapshot, or the built-in fallback if there is none"""
+        snapshot = self._snapshot
+        if snapshot is not None:
+            logger.info("Serving last-known-good catalog snapshot")
+            return snapshot
+        
+        if self._fallback is None:
+            products = tuple(self._get_fallback_products())
+            self._fallback = CatalogSnapshot(products, self._compute_version(products), datetime.min)
+        else:
+            logger.info("Using fallback mock product data")
+        return self._fallback
     
-    def get_products(self, use_cache: bool = True) -> List[Dict]:
+    def _get_snapshot(self, use_cache: bool = True) -> CatalogSnapshot:
         """
-        Fetch all products from FakeStore API
+        Return the current catalog snapshot, refreshing it if needed
+        
+        A stale snapshot is returned straight away and refreshed in the
+        background, so requests never wait on the upstream while there is
+        any catalog to serve. Only a cold start without one blocks.
+        """
+        snapshot = self._snapshot
+        if use_cache and self._is_fresh(snapshot):
+            return snapshot
+        
+        if use_cache and snapshot is not None:
+            self._refresh_in_background()
+            return snapshot
+        
+        self._refresh_lock.acquire()
+        try:
+            # Another thread may have refreshed or failed while we waited
+            snapshot = self._snapshot
+            if use_cache and self._is_fresh(snapshot):
+                return snapshot
+            if use_cache and self._failed_at and datetime.now() - self._failed_at < self._retry_interval:
+                return self._get_last_known_good()
+            
+            return self._refresh()
+        finally:
+            self._refresh_lock.release()
+    
+    def _refresh_in_background(self) -> None:
+        """Start a refresh on a daemon thread unless one is running or backing off"""
+        if not self._refresh_lock.acquire(blocking=False):
+            return
+        
+        if self._failed_at and datetime.now() - self._failed_at < self._retry_interval:
+            self._refresh_lock.release()
+            return
+        
+        def run():
+            try:
+                # Another thread may have refreshed since the lock was taken
+                if not self._is_fresh(self._snapshot):
+                    self._refresh()
+            finally:
+                self._refresh_lock.release()
+        
+        try:
+            threading.Thread(target=run, name='catalog-refresh', daemon=True).start()
+        except Exception:
+            self._refresh_lock.release()
+            raise
+    
+    def wait_for_refresh(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait for a running catalog refresh to finish
         
         Args:
-            use_cache: Whether to use cached data if available
+            timeout: Seconds to wait, or None to wait indefinitely
             
         Returns:
-            List of product dictionaries, or empty list on error
+            True if no refresh is running any more, False on timeout
         """
-        cache_key = 'all_products'
-        
-        # Try cache first
-        if use_cache:
-            cached_data = self._get_from_cache(cache_key)
-            if cached_data is not None:
-                return cached_data
-        
+        if not self._refresh_lock.acquire(timeout=-1 if timeout is None else timeout):
+            return False
+        self._refresh_lock.release()
+        return True
+    
+    def _refresh(self) -> CatalogSnapshot:
+        """Fetch the catalog upstream and publish it; caller must hold the refresh lock"""
         try:
             url = f"{self.base_url}/products"
             logger.info(f"Fetching products from {url}")
@@ -78,20 +242,25 @@ class APIHelper:
             response.raise_for_status()
             
             data = response.json()
-            
-            # Save to cache
-            if use_cache:
-                self._save_to_cache(cache_key, data)
+            if not isinstance(data, list):
+                raise ValueError(f"Expected a list of products, got {type(data).__name__}")
+            if not data:
+                # Never let an empty response replace the last-known-good catalog
+                raise ValueError("Upstream returned an empty product list")
             
             logger.info(f"Successfully fetched {len(data)} products")
-            return data
+            snapshot = self._publish(data)
+            self._failed_at = None
+            
+            # Persist as the last-known-good catalog
+            self._save_snapshot(snapshot)
+            return snapshot
             
         except requests.exceptions.HTTPError as e:
             if e.response.status_code == 403:
-                logger.warning(f"API returned 403 Forbidden. Using fallback mock data.")
-                # Return fallback mock data
-                return self._get_fallback_products()
-            logger.error(f"HTTP error fetching products: {e}")
+                logger.warning(f"API returned 403 Forbidden. Using last-known-good data.")
+            else:
+                logger.error(f"HTTP error fetching products: {e}")
         except requests.exceptions.Timeout:
             logger.error(f"Timeout while fetching products from {self.base_url}")
         except requests.exceptions.ConnectionError:
@@ -103,8 +272,33 @@ class APIHelper:
         except Exception as e:
             logger.error(f"Unexpected error: {e}")
         
-        # Return fallback data if all else fails
-        return self._get_fallback_products()
+        # Serve the newest snapshot (or fallback data) if all else fails
+        self._failed_at = datetime.now()
+        return self._get_last_known_good()
+    
+    def get_products(self, use_cache: bool = True) -> Sequence[Dict]:
+        """
+        Fetch all products from FakeStore API
+        
+        Args:
+            use_cache: Whether to use cached data if available
+            
+        Returns:
+            Read-only sequence of product dictionaries; the last-known-good
+            or fallback catalog on error
+        """
+        return self._get_snapshot(use_cache).products
+    
+    def get_catalog(self) -> Tuple[Sequence[Dict], str]:
+        """
+        Fetch all products together with their catalog version
+        
+        Returns:
+            Tuple of (products, version), where version changes whenever
+            the product data changes
+        """
+        snapshot = self._get_snapshot()
+        return snapshot.products, snapshot.version
     
     def get_product_by_id(self, product_id: int) -> Optional[Dict]:
         """
@@ -132,8 +326,13 @@ class APIHelper:
             return None
     
     def clear_cache(self) -> None:
-        """Clear all cached data"""
-        self._cache.clear()
+        """Mark the current snapshot as expired so the next read refreshes it"""
+        with self._refresh_lock:
+            snapshot = self._snapshot
+            if snapshot is not None:
+                # Keep it as last-known-good, just no longer fresh
+                self._snapshot = snapshot._replace(timestamp=datetime.min)
+            self._failed_at = None
         logger.info("Cache cleared")
     
     def _get_fallback_products(self) -> List[Dict]:
@@ -456,4 +655,6 @@ class APIHelper:
 
 
 # Global instance
-api_helper = APIHelper()
+api_helper = APIHelper(
+    snapshot_path=os.environ.get('CATALOG_SNAPSHOT_PATH', DEFAULT_SNAPSHOT_PATH)
+)